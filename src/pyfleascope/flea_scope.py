@@ -1,7 +1,11 @@
+from collections.abc import Callable
 from datetime import timedelta
 from enum import Enum
 import functools
 import logging
+import math
+import re
+import numpy as np
 import pandas as pd
 import io
 import time
@@ -11,12 +15,77 @@ from pyfleascope.trigger_config import AnalogTrigger, AnalogTriggerBehavior, Dig
 
 logging.basicConfig(level=logging.INFO)
 
+# One capture line: a float BNC reading and a hex digital bitmap.
+_CAPTURE_LINE = re.compile(r'([-+\d.eE]+),([0-9a-fA-F]+)')
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _explode_bits(bm, out):
+        for i in prange(bm.shape[0]):
+            for b in range(10):
+                out[i, b] = (bm[i] >> b) & 1
+else:
+    _explode_bits = None
+
+def _v2r(voltage, scale, bias):
+    return voltage * scale + bias
+
+if njit is not None:
+    # Native scalar/array kernel for bulk trigger-threshold evaluation.
+    _v2r = njit(cache=True)(_v2r)
+
 class Waveform(Enum):
     SINE= "sine"
     SQUARE= "square"
     TRIANGLE= "triangle"
     EKG = "ekg"
 
+@functools.lru_cache(maxsize=8)
+def _make_time_index(effective_msps: float, n: int) -> pd.Index:
+    # Repeated captures at the same resolution (live plotting) reuse the
+    # identical index instead of re-deriving it per acquisition.
+    return pd.Index(np.arange(n) / 1_000_000 / effective_msps)
+
+class _CaptureSink:
+    """Incrementally parses capture lines as serial chunks arrive, so CSV
+    decoding overlaps with the wire transfer instead of following it."""
+
+    def __init__(self, expected_rows: int):
+        self._tail = b''
+        self._bnc = np.empty(expected_rows, dtype=np.float64)
+        self._bitmap = np.empty(expected_rows, dtype=np.uint16)
+        self._rows = 0
+
+    def __call__(self, chunk: bytes):
+        data = self._tail + chunk
+        lines = data.split(b'\n')
+        self._tail = lines.pop()
+        for line in lines:
+            bnc_str, sep, bm_str = line.strip().partition(b',')
+            if not sep:
+                continue
+            if self._rows == len(self._bnc):
+                self._bnc = np.resize(self._bnc, self._rows * 2)
+                self._bitmap = np.resize(self._bitmap, self._rows * 2)
+            self._bnc[self._rows] = float(bnc_str)
+            self._bitmap[self._rows] = int(bm_str, 16)
+            self._rows += 1
+
+    def arrays(self):
+        return self._bnc[:self._rows], self._bitmap[:self._rows]
+
 class FleaDevice():
     def __init__(self, name: str, port: str):
         self.name = name
@@ -96,6 +165,11 @@ class FleaScope():
     _INTERLEAVE = 5 # number of ADCs interleaved
     _TOTAL_SAMPLES = 2000
 
+    # Opt-in: parse the full response after the read instead of streaming,
+    # with pyarrow's multithreaded CSV reader when installed (np.fromregex
+    # otherwise). Off by default.
+    use_pyarrow = False
+
     serial : FleaTerminal
 
     @staticmethod
@@ -104,6 +178,8 @@ class FleaScope():
 
     def __init__(self, serial: FleaTerminal, read_calibrations: bool):
         self.serial = serial
+        self._scope_cmd_key: tuple[int, str, int] | None = None
+        self._scope_cmd = ''
         logging.debug("Turning off echo")
         self.serial.exec("echo off")
 
@@ -139,7 +215,8 @@ class FleaScope():
     def _prescaler_to_effective_msps(self, prescaler: int):
         return self._MCU_MHZ * self._INTERLEAVE / prescaler
         
-    def raw_read(self, time_frame: timedelta, trigger_fields: str, delay: timedelta = timedelta(milliseconds=0)):
+    def raw_read(self, time_frame: timedelta, trigger_fields: str, delay: timedelta = timedelta(milliseconds=0),
+                 bnc_transform: Callable[[np.ndarray], None] | None = None):
         if time_frame.total_seconds() < 0:
             raise ValueError("Time frame cannot be negative.")
         if time_frame.total_seconds() > 3.49:
@@ -164,24 +241,82 @@ class FleaScope():
             raise ValueError("Delay too large. More than 1M samples.")
 
         logging.debug(f"Reading with {number1} tick resolution with trigger {trigger_fields} and delay {delay_samples}")
-        data = self.serial.exec(f"scope {number1} {trigger_fields} {delay_samples}")
-        data = pd.read_csv(
-            io.StringIO(data),
-            names=["bnc", "bitmap"],
-            sep=",",
-            header=None,
-            dtype={0: float, 1: str})
+        # Reuse the formatted command (and via the terminal's cache, its
+        # encoding) when the acquisition settings are unchanged.
+        key = (number1, trigger_fields, delay_samples)
+        if key == self._scope_cmd_key:
+            command = self._scope_cmd
+        else:
+            command = f"scope {number1} {trigger_fields} {delay_samples}"
+            self._scope_cmd_key = key
+            self._scope_cmd = command
+        if self.use_pyarrow:
+            data = self._parse_capture(self.serial.exec(command), bnc_transform)
+        else:
+            sink = _CaptureSink(self._TOTAL_SAMPLES)
+            self.serial.exec(command, sink=sink)
+            bnc, bitmap = sink.arrays()
+            if bnc_transform is not None:
+                bnc_transform(bnc)
+            data = pd.DataFrame({'bnc': bnc, 'bitmap': bitmap}, copy=False)
         # TODO label jitter correctly
-        data.set_index(
-            pd.RangeIndex(start=0, stop=len(data), step=1) / 1_000_000 / effective_msps,
-            inplace=True)
+        data.index = _make_time_index(effective_msps, len(data))
         return data
 
+    @staticmethod
+    def _parse_capture(raw: str, bnc_transform: Callable[[np.ndarray], None] | None = None) -> pd.DataFrame:
+        # bnc_transform is applied in place to the freshly parsed array while
+        # we still own its buffer, so no column reassignment is needed later.
+        # Uses pyarrow's CSV reader when installed, np.fromregex otherwise.
+        if pacsv is not None:
+            table = pacsv.read_csv(
+                io.BytesIO(raw.encode()),
+                read_options=pacsv.ReadOptions(column_names=['bnc', 'bitmap']),
+                parse_options=pacsv.ParseOptions(delimiter=','),
+                convert_options=pacsv.ConvertOptions(
+                    column_types={'bnc': pa.float64(), 'bitmap': pa.string()}))
+            if bnc_transform is None:
+                return table.to_pandas(split_blocks=True, self_destruct=True)
+            bnc = table.column('bnc').to_numpy(zero_copy_only=False)
+            if not bnc.flags.writeable:
+                # pyarrow hands out read-only views of its buffers.
+                bnc = bnc.copy()
+            bnc_transform(bnc)
+            bitmap = table.column('bitmap').to_numpy(zero_copy_only=False)
+            return pd.DataFrame({'bnc': bnc, 'bitmap': bitmap}, copy=False)
+        records = np.fromregex(
+            io.StringIO(raw),
+            _CAPTURE_LINE,
+            dtype=[('bnc', np.float64), ('bitmap', 'U4')])
+        bnc = records['bnc']
+        if bnc_transform is not None:
+            bnc_transform(bnc)
+        return pd.DataFrame({'bnc': bnc, 'bitmap': records['bitmap']}, copy=False)
+
+    @staticmethod
+    def _parse_bitmaps(bitmaps: pd.Series) -> np.ndarray:
+        # Pad every hex string to 16 bit width so the whole column can be
+        # decoded with a single bytes.fromhex instead of one int(s, 16) per row.
+        joined = ''.join(bitmaps.str.zfill(4))
+        raw = np.frombuffer(bytes.fromhex(joined), dtype=np.uint8).reshape(-1, 2)
+        return (raw[:, 0].astype(np.uint16) << 8) | raw[:, 1]
+
     @staticmethod
     def extract_bits(data: pd.DataFrame):
-        data['bitmap'] = data['bitmap'].apply(functools.partial(int, base=16))
-        for bit in range(10):
-            data[f'bit_{bit}'] = data['bitmap'].apply(lambda x: bool((x >> bit) & 1))
+        bitmaps = data['bitmap']
+        if pd.api.types.is_integer_dtype(bitmaps):
+            # The streaming capture path already parsed the hex strings.
+            vals = bitmaps.to_numpy().astype(np.uint16, copy=False)
+        else:
+            vals = FleaScope._parse_bitmaps(bitmaps)
+        if _explode_bits is not None:
+            bits = np.empty((len(vals), 10), dtype=np.bool_)
+            _explode_bits(vals, bits)
+        else:
+            # One C-level call that expands every uint16 into its bits at once.
+            sample_bytes = vals.astype('<u2', copy=False).view(np.uint8).reshape(-1, 2)
+            bits = np.unpackbits(sample_bytes, axis=1, bitorder='little')[:, :10].astype(bool)
+        data[[f'bit_{bit}' for bit in range(10)]] = bits
         return data.drop(columns=['bitmap'])
     
     def unblock(self):
@@ -197,15 +332,27 @@ class FleaScope():
 
 
 class FleaProbe():
-    _scope: FleaScope
-    _multiplier: int
-    _cal_zero: float | None = None # value for 0V
-    _cal_3v3: float | None = None # value-diff 0V - 3.3V
+    __slots__ = ('_scope', '_multiplier', '_cal_zero', '_cal_3v3',
+                 '_offset', '_scale', '_v2r_scale', '_v2r_bias')
 
     def __init__(self, scope: FleaScope, multiplier: int):
         self._scope = scope
         self._multiplier = multiplier
-    
+        # NaN encodes "not calibrated" so the values stay plain floats.
+        self._cal_zero = math.nan # value for 0V
+        self._cal_3v3 = math.nan # value-diff 0V - 3.3V
+        self._offset = math.nan # pre-baked raw->voltage offset
+        self._scale = math.nan # pre-baked raw->voltage scale
+        self._v2r_scale = math.nan # pre-baked voltage->raw scale
+        self._v2r_bias = math.nan # pre-baked voltage->raw bias
+
+    def _cache_conversion(self):
+        if not (math.isnan(self._cal_zero) or math.isnan(self._cal_3v3)):
+            self._offset = self._cal_zero
+            self._scale = 3.3 / self._cal_3v3
+            self._v2r_scale = self._cal_3v3 / 3.3
+            self._v2r_bias = self._cal_zero
+
     def read_calibration_from_flash(self):
         dim_result = self._scope.serial.exec(f"dim cal_zero_x{self._multiplier} as flash, cal_3v3_x{self._multiplier} as flash")
         if dim_result == f"var 'cal_zero_x{self._multiplier}' already declared at this scope\r\nvar 'cal_3v3_x{self._multiplier}' already declared at this scope":
@@ -216,13 +363,15 @@ class FleaProbe():
         logging.debug(f"Probe x{self._multiplier} calibration: cal_zero={self._cal_zero}, cal_3v3={self._cal_3v3}")
         if (self._cal_zero == self._cal_3v3):
             raise ValueError(f"Calibration values for probe x{self._multiplier} are equal ({self._cal_zero}).")
+        self._cache_conversion()
 
     def set_calibration(self, offset_0: float, offset_3v3: float):
         self._cal_zero = offset_0
         self._cal_3v3 = offset_3v3
+        self._cache_conversion()
 
     def write_calibration_to_flash(self):
-        if self._cal_zero is None or self._cal_3v3 is None:
+        if math.isnan(self._cal_zero) or math.isnan(self._cal_3v3):
             raise ValueError("Calibration values are not set.")
         self._scope.serial.exec(f"cal_zero_x{self._multiplier} = {int(self._cal_zero - 2048 + 1000 + 0.5)}")
         self._scope.serial.exec(f"cal_3v3_x{self._multiplier} = {int(self._cal_3v3 * self._multiplier + 1000 + 0.5)}")
@@ -238,14 +387,14 @@ class FleaProbe():
         return bnc_data.mean()
 
     def _raw_to_voltage(self, raw_value: float):
-        if self._cal_zero is None or self._cal_3v3 is None:
+        if math.isnan(self._scale):
             raise ValueError("Calibration values are not set.")
-        return (raw_value - self._cal_zero) / self._cal_3v3 * 3.3
+        return (raw_value - self._offset) * self._scale
 
     def _voltage_to_raw(self, voltage: float):
-        if self._cal_zero is None or self._cal_3v3 is None:
+        if math.isnan(self._v2r_scale):
             raise ValueError("Calibration values are not set.")
-        return (voltage / 3.3 * self._cal_3v3) + self._cal_zero
+        return _v2r(voltage, self._v2r_scale, self._v2r_bias)
 
     def calibrate_0(self):
         # should be within ([2028, 2140]) for x1. default 2104
@@ -262,14 +411,16 @@ class FleaProbe():
         self._cal_zero = self.read_stable_value_for_calibration()
         if raw_value_3v3 is not None:
             self._cal_3v3 = raw_value_3v3 - self._cal_zero
+        self._cache_conversion()
         return self._cal_zero
 
     def calibrate_3v3(self):
         # should be within [940, 1100] for x1. default 1036
         # should be within [88, 120] for x10. default 108
-        if self._cal_zero is None:
+        if math.isnan(self._cal_zero):
             raise ValueError("Zero-Calibration needs to be done first.")
         self._cal_3v3 = self.read_stable_value_for_calibration() - self._cal_zero
+        self._cache_conversion()
         return self._cal_3v3
 
     def read(self, time_frame: timedelta, trigger: DigitalTrigger | AnalogTrigger | None = None, delay: timedelta = timedelta(milliseconds=0)):
@@ -279,6 +430,12 @@ class FleaProbe():
             trigger_fields = trigger.into_trigger_fields()
         else:
             trigger_fields = trigger.into_trigger_fields(self._voltage_to_raw)
-        df = self._scope.raw_read(time_frame, trigger_fields, delay)
-        df['bnc'] = self._raw_to_voltage(df['bnc'])
-        return df
+        if math.isnan(self._scale):
+            raise ValueError("Calibration values are not set.")
+        return self._scope.raw_read(time_frame, trigger_fields, delay,
+                                    bnc_transform=self._convert_raw_inplace)
+
+    def _convert_raw_inplace(self, arr: np.ndarray):
+        # Fused single-pass raw->voltage conversion on a buffer we own.
+        np.subtract(arr, self._offset, out=arr)
+        np.multiply(arr, self._scale, out=arr)
@@ -1,15 +1,28 @@
+from collections.abc import Callable
 import logging
+import time
 import serial
 
 class FleaTerminal:
     def __init__(self, port: str, baudrate: int = 9600):
         self._serial = serial.Serial(port, baudrate)
+        if hasattr(self._serial, 'set_buffer_size'):
+            # Only available on Windows; enlarges the driver RX buffer so a
+            # full capture fits without overruns.
+            self._serial.set_buffer_size(rx_size=65536)
         self._port = port
         self._baudrate = baudrate
         self._prompt = '> '
+        self._prompt_b = self._prompt.encode()
+        # Repeated commands (echo off, ver, scope ... at fixed settings)
+        # reuse their encoded bytes; capped so one-off commands can't grow it.
+        self._cmd_cache: dict[str, bytes] = {}
+        # Reused across exec calls so steady-state reads don't regrow a
+        # fresh bytearray for every response.
+        self._rx_buf = bytearray()
         self._initialized = False
         self._flush()
-    
+
     def initialize(self):
         logging.debug("Connected to FleaScope. Sending CTRL-C to reset.")
         self.send_ctrl_c()
@@ -17,29 +30,53 @@ class FleaTerminal:
         self._exec("prompt on", timeout=1.0)
         self._initialized = True
         self._flush()
-    
+
+    def set_baudrate(self, baudrate: int):
+        """Switch the host-side baud rate. The device must already have been
+        told to switch (or support the new rate) before calling this."""
+        self._serial.baudrate = baudrate
+        self._baudrate = baudrate
+
     def _flush(self):
         self._serial.timeout = 0
         self._serial.read_all()
 
-    def exec(self, command: str, timeout: float | None = None):
+    def exec(self, command: str, timeout: float | None = None, sink: Callable[[bytes], None] | None = None):
         assert self._initialized, f"FleaTerminal {self._port} not initialized. Value: {self._initialized} Call initialize() first."
-        return self._exec(command, timeout)
-
-    def _exec(self, command: str, timeout: float | None):
-        self._serial.write((command + "\n").encode())
-        self._serial.timeout = timeout
-        response = self._serial.read_until(self._prompt.encode()).decode()
-        if response[-2:] != self._prompt:
-            raise TimeoutError(f"Expected prompt '{self._prompt}' but got '{response[-2:]}'. Likely due to a timeout.")
-        return response[:-2].strip()
-    
+        return self._exec(command, timeout, sink)
+
+    def _exec(self, command: str, timeout: float | None, sink: Callable[[bytes], None] | None = None):
+        cmd = self._cmd_cache.get(command)
+        if cmd is None:
+            cmd = (command + "\n").encode()
+            if len(self._cmd_cache) < 64:
+                self._cmd_cache[command] = cmd
+        self._serial.write(cmd)
+        prompt = self._prompt_b
+        deadline = None if timeout is None else time.monotonic() + timeout
+        buf = self._rx_buf
+        del buf[:]
+        # Poll in chunks: block briefly for the first byte, then drain
+        # whatever has arrived, instead of read_until's byte-by-byte loop.
+        # A sink sees each chunk as it lands, so callers can parse the
+        # response while the rest is still on the wire.
+        self._serial.timeout = 0.05
+        while not buf.endswith(prompt):
+            chunk = self._serial.read(max(1, self._serial.in_waiting))
+            buf.extend(chunk)
+            if sink is not None and chunk:
+                sink(chunk)
+            if deadline is not None and time.monotonic() > deadline and not buf.endswith(prompt):
+                response = buf.decode()
+                raise TimeoutError(f"Expected prompt '{self._prompt}' but got '{response[-2:]}'. Likely due to a timeout.")
+        return buf[:-len(prompt)].decode().strip()
+
     def send_ctrl_c(self):
         self._serial.write(b'\x03')
         # self._flush()
 
     def send_reset(self):
         self._serial.write(b'reset\n')
-    
+
     def __del__(self):
-        self._serial.close()
\ No newline at end of file
+        self._serial.close()
@@ -1,10 +1,27 @@
 from enum import Enum, auto
 from collections.abc import Callable
+import numpy as np
 
 class BitState(Enum):
     HIGH = auto()
     LOW = auto()
-    DONT_CARE = auto() 
+    DONT_CARE = auto()
+
+_N_TRIGGER_BITS = 9
+_STATE_ORD = {BitState.DONT_CARE: 0, BitState.LOW: 1, BitState.HIGH: 2}
+_POW3 = [3 ** i for i in range(_N_TRIGGER_BITS)]
+
+def _build_trigger_masks():
+    # (active_mask, relevant_mask) for every combination of 9 tri-state bits,
+    # indexed by the packed ternary key used in into_trigger_fields.
+    keys = np.arange(3 ** _N_TRIGGER_BITS)
+    digits = (keys[:, None] // np.array(_POW3)) % 3
+    weights = 1 << np.arange(_N_TRIGGER_BITS)
+    active = ((digits == _STATE_ORD[BitState.HIGH]) * weights).sum(axis=1)
+    relevant = ((digits != _STATE_ORD[BitState.DONT_CARE]) * weights).sum(axis=1)
+    return np.stack([active, relevant], axis=1).astype(np.uint16)
+
+_TRIGGER_MASKS = _build_trigger_masks()
 
 class DigitalTriggerBehavior(Enum):
     AUTO = "~"
@@ -19,22 +36,20 @@ class AnalogTriggerBehavior(Enum):
     FALLING = "-" 
 
 class BitTriggerBuilder:
-    _bit_states = [
-        BitState.DONT_CARE,
-        BitState.DONT_CARE,
-        BitState.DONT_CARE,
-        BitState.DONT_CARE,
-        BitState.DONT_CARE,
-        BitState.DONT_CARE,
-        BitState.DONT_CARE,
-        BitState.DONT_CARE,
-        BitState.DONT_CARE,
-    ]
+    def __init__(self):
+        self._active = 0
+        self._relevant = 0
 
     def set_bit(self, bit: int, state: BitState):
-        if bit < 0 or bit > len(self._bit_states):
-            raise ValueError(f"Bit must be between 0 and {len(self._bit_states) - 1}")
-        self._bit_states[bit] = state
+        if bit < 0 or bit >= _N_TRIGGER_BITS:
+            raise ValueError(f"Bit must be between 0 and {_N_TRIGGER_BITS - 1}")
+        mask = 1 << bit
+        self._active &= ~mask
+        self._relevant &= ~mask
+        if state == BitState.HIGH:
+            self._active |= mask
+        if state != BitState.DONT_CARE:
+            self._relevant |= mask
         return self
     
     def bit0(self, state: BitState):
@@ -57,39 +72,48 @@ class BitTriggerBuilder:
         return self.set_bit(8, state)
 
     def is_matching(self):
-        return DigitalTrigger(self._bit_states, DigitalTriggerBehavior.WHILE)
+        return DigitalTrigger._from_masks(self._active, self._relevant, DigitalTriggerBehavior.WHILE)
 
     def starts_matching(self):
-        return DigitalTrigger(self._bit_states, DigitalTriggerBehavior.START)
+        return DigitalTrigger._from_masks(self._active, self._relevant, DigitalTriggerBehavior.START)
 
     def stops_matching(self):
-        return DigitalTrigger(self._bit_states, DigitalTriggerBehavior.STOP)
-    
+        return DigitalTrigger._from_masks(self._active, self._relevant, DigitalTriggerBehavior.STOP)
+
     def auto(self):
         """Same as is_matching, but will also trigger when the bits did not match within 100ms."""
-        return DigitalTrigger(self._bit_states, DigitalTriggerBehavior.AUTO)
-    
+        return DigitalTrigger._from_masks(self._active, self._relevant, DigitalTriggerBehavior.AUTO)
+
 class DigitalTrigger:
     def __init__(self, bit_states: list[BitState], behavior: DigitalTriggerBehavior):
         self.bit_states = bit_states
         self.behavior = behavior
-    
+        key = sum(_STATE_ORD[state] * p for state, p in zip(bit_states, _POW3))
+        active_bits, relevant_bits = _TRIGGER_MASKS[key]
+        self._active = int(active_bits)
+        self._relevant = int(relevant_bits)
+        self._fields = f"{behavior.value}0x{self._active:02x} 0x{self._relevant:02x}"
+
+    @classmethod
+    def _from_masks(cls, active_bits: int, relevant_bits: int, behavior: DigitalTriggerBehavior):
+        trigger = cls.__new__(cls)
+        trigger.bit_states = [
+            BitState.HIGH if (active_bits >> i) & 1
+            else BitState.LOW if (relevant_bits >> i) & 1
+            else BitState.DONT_CARE
+            for i in range(_N_TRIGGER_BITS)]
+        trigger.behavior = behavior
+        trigger._active = active_bits
+        trigger._relevant = relevant_bits
+        trigger._fields = f"{behavior.value}0x{active_bits:02x} 0x{relevant_bits:02x}"
+        return trigger
+
     @staticmethod
     def start_capturing_when():
         return BitTriggerBuilder()
-    
+
     def into_trigger_fields(self):
-        relevant_bits = 0
-        for i, state in enumerate(self.bit_states):
-            if state != BitState.DONT_CARE:
-                relevant_bits |= (1 << i)
-        active_bits = 0
-        for i, state in enumerate(self.bit_states):
-            if state == BitState.HIGH:
-                active_bits |= (1 << i)
-        trigger_behavior_flag = self.behavior.value
-
-        return f"{trigger_behavior_flag}0x{active_bits:02x} 0x{relevant_bits:02x}"
+        return self._fields
 
 class AnalogTriggerBuilder:
     def rising_edge(self, volts: float):
@@ -106,14 +130,14 @@ class AnalogTrigger:
     def __init__(self, level: float, behavior: AnalogTriggerBehavior):
         self.level = level
         self.behavior = behavior
+        self._prefix = behavior.value
 
     @staticmethod
     def start_capturing_when():
         return AnalogTriggerBuilder()
-    
+
     def into_trigger_fields(self, voltage_to_raw: Callable[[float], float]):
-        trigger_behavior_flag = self.behavior.value
         raw_level = int(voltage_to_raw(self.level)/4 + 0.5)
         if raw_level < -1023 or raw_level > 1023:
             raise ValueError(f"Voltage {self.level} out of range, must be between -1023 and 1023 raw units")
-        return f"{trigger_behavior_flag}{raw_level} 0"
\ No newline at end of file
+        return f"{self._prefix}{raw_level} 0"
\ No newline at end of file